@@ -4,11 +4,21 @@ import numpy as np
 import re
 import os
 import json
-import matplotlib.pyplot as plt
-from collections import Counter, defaultdict
+import csv
+import bisect
+import pickle
+import tempfile
+import altair as alt
 from typing import Dict, Tuple, Optional, List
 from rapidfuzz import process, fuzz
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import orjson  # optional, faster JSON parsing
+except ImportError:
+    orjson = None
 
 # Set page config
 st.set_page_config(
@@ -19,70 +29,174 @@ st.set_page_config(
 
 # Import your helper functions from main.py
 def standardize_cols(df: pd.DataFrame) -> pd.DataFrame:
-    lower_map = {c: c.strip().lower() for c in df.columns}
-    df = df.rename(columns=lower_map)
-    return df
+    # set_axis returns a new frame, so callers' frames keep their original headers
+    return df.set_axis(df.columns.str.strip().str.lower(), axis=1)
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+# Same substitution as _PUNCT_RE for ASCII text, done by str.translate without the regex engine.
+# A 128-char string (indexed by code point) is much faster to translate with than a dict.
+_PUNCT_TABLE = "".join(
+    c if c.isalnum() or c.isspace() or c == "_" else " "
+    for c in map(chr, range(128))
+)
+
+@lru_cache(maxsize=65536)
+def _normalize_cached(text: str) -> str:
+    # Shared across the reference and source columns, which repeat the same merchants
+    t = text.strip().lower()
+    t = t.translate(_PUNCT_TABLE) if t.isascii() else _PUNCT_RE.sub(" ", t)
+    return _WS_RE.sub(" ", t).strip()
 
 def normalize(text: str) -> str:
     if not isinstance(text, str):
         text = "" if pd.isna(text) else str(text)
-    t = text.strip().lower()
-    t = re.compile(r"[^\w\s]").sub(" ", t)
-    t = re.compile(r"\s+").sub(" ", t)
-    return t.strip()
+    return _normalize_cached(text)
 
-def most_common_pair(pairs: List[Tuple[str, str]]) -> Tuple[Optional[str], Optional[str]]:
-    if not pairs:
-        return None, None
-    counter = Counter(pairs)
-    (cat, subcat), _ = counter.most_common(1)[0]
-    return cat, subcat
+def normalize_series(s: pd.Series) -> pd.Series:
+    """Normalize a whole column, running normalize() once per distinct value"""
+    codes, uniques = pd.factorize(s)
+    # Missing values get code -1, which picks the trailing "" (what normalize returns for NaN)
+    normalized = np.array([normalize(u) for u in uniques] + [""], dtype=object)
+    return pd.Series(normalized[codes], index=s.index, dtype=object)
 
 def build_description_lookup(dest_df: pd.DataFrame) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
-    pairs_by_desc: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
-    for _, row in dest_df.iterrows():
-        nd = normalize(row.get("description", ""))
-        cat = row.get("category")
-        sub = row.get("sub-category") if "sub-category" in row else row.get("sub_category")
-        if pd.notna(cat) and pd.notna(sub):
-            pairs_by_desc[nd].append((str(cat), str(sub)))
-    lookup: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
-    for nd, pairs in pairs_by_desc.items():
-        lookup[nd] = most_common_pair(pairs)
-    return lookup
+    """Map each normalized description to its most common (category, sub-category) pair"""
+    sub_col = "sub-category" if "sub-category" in dest_df.columns else "sub_category"
+    if sub_col not in dest_df.columns:
+        return {}
+    # Drop rows missing a category or sub-category first, so only kept rows get normalized
+    labeled = dest_df.dropna(subset=["category", sub_col])
+    pairs = pd.DataFrame({
+        "nd": normalize_series(labeled["description"]),
+        "category": labeled["category"].astype(str),
+        "sub": labeled[sub_col].astype(str),
+    })
+    
+    # Groups come out in first-seen order; a stable sort by count then keeps the
+    # first-seen pair on ties, the same pick Counter.most_common would make
+    counts = pairs.groupby(["nd", "category", "sub"], sort=False).size()
+    top = counts.sort_values(ascending=False, kind="stable")
+    top = top[~top.index.get_level_values("nd").duplicated()]
+    best = {nd: (cat, sub) for nd, cat, sub in top.index}
+    
+    # Keep keys in first-seen order; fuzzy matching breaks score ties by choice order
+    return {nd: best[nd] for nd in pairs["nd"].unique()}
 
-def fuzzy_best_match(query: str, choices: List[str], threshold: int = 90) -> Tuple[Optional[str], float]:
-    if not choices:
-        return None, 0.0
-    match = process.extractOne(query, choices, scorer=fuzz.token_set_ratio)
-    if match is None:
-        return None, 0.0
-    choice, score, _ = match
-    return choice, float(score)
-
-def get_available_folders():
-    """Get list of available folders in the current directory"""
-    current_dir = os.getcwd()
-    folders = [d for d in os.listdir(current_dir) 
-              if os.path.isdir(os.path.join(current_dir, d)) 
-              and not d.startswith('.')]
+def fuzzy_best_matches(queries: List[str], choices: List[str], threshold: int = 90, batch_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+    """Score all queries against all choices with process.cdist and return the best
+    choice index and score per query. Queries with no choice scoring >= threshold get index -1."""
+    best_idx = np.full(len(queries), -1, dtype=np.intp)
+    best_score = np.zeros(len(queries))
+    if not queries or not choices:
+        return best_idx, best_score
+    
+    # Score in batches so the (queries x choices) matrix stays bounded in memory. float32 halves
+    # it without reordering scores; uint8 would round near scores into ties and flip argmax picks.
+    for start in range(0, len(queries), batch_size):
+        # Both sides are already normalize()d, so skip rapidfuzz's preprocessing callback
+        scores = process.cdist(
+            queries[start:start + batch_size], choices,
+            scorer=fuzz.token_set_ratio, processor=None, score_cutoff=threshold, dtype=np.float32, workers=-1,
+        )
+        rows = np.arange(scores.shape[0])
+        idx = scores.argmax(axis=1)
+        top = scores[rows, idx]
+        matched = top >= threshold
+        best_idx[start:start + len(rows)] = np.where(matched, idx, -1)
+        best_score[start:start + len(rows)] = np.where(matched, top, 0.0)
+    return best_idx, best_score
+
+@st.cache_data(ttl=5)
+def get_available_folders(cwd):
+    """Get list of available folders in cwd (passed in so it is part of the cache key)"""
+    # scandir entries cache their type, so no extra stat call per folder
+    with os.scandir(cwd) as entries:
+        folders = [e.name for e in entries if e.is_dir() and not e.name.startswith('.')]
     return sorted(folders)
 
-def get_available_files(folder_name):
-    """Get list of available CSV files from specified directory"""
+@st.cache_data(ttl=5)
+def get_available_files(folder_name, cwd):
+    """Get list of available CSV files from specified directory, resolved against cwd"""
     if not folder_name:
         return []
         
-    absolute_path = os.path.abspath(folder_name)
+    absolute_path = os.path.join(cwd, folder_name)
     
-    if not os.path.exists(absolute_path):
+    if not os.path.isdir(absolute_path):
         return []
     
-    csv_files = [f for f in os.listdir(absolute_path) if f.lower().endswith(".csv")]
+    with os.scandir(absolute_path) as entries:
+        csv_files = [e.name for e in entries if e.is_file() and e.name.lower().endswith(".csv")]
     return sorted(csv_files)
 
-@st.cache_data
+# Explicit column types for transaction CSVs, keyed by standardized column name
+_SOURCE_DTYPES = {"date": str, "description": str, "amount": "float64", "card": str}
+REQUIRED_SRC_COLS = set(_SOURCE_DTYPES)
+
+def read_source_file(file_path):
+    """Read and validate a single transaction CSV, tagging rows with their source file name"""
+    # Key the dtypes by the file's own header spelling, since standardize_cols runs after the read
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtype = {col: _SOURCE_DTYPES[col.strip().lower()] for col in header if col.strip().lower() in _SOURCE_DTYPES}
+    df = standardize_cols(pd.read_csv(file_path, engine="pyarrow", dtype=dtype))
+    filename = os.path.basename(file_path)
+    if not REQUIRED_SRC_COLS.issubset(df.columns):
+        raise ValueError(f"Source file {filename} missing required columns: {REQUIRED_SRC_COLS - set(df.columns)}")
+    df["source_file"] = filename
+    return df
+
+# Bump whenever normalize() or build_description_lookup() changes, so old sidecars are rebuilt
+_LOOKUP_CACHE_VERSION = 1
+
+def load_reference_lookup(reference_file):
+    """Build the description lookup for reference_file, reusing a pickle sidecar while the file is unchanged"""
+    stat = os.stat(reference_file)
+    signature = (_LOOKUP_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    sidecar = os.path.splitext(reference_file)[0] + ".cache.pkl"
+    
+    # A stale, unreadable or corrupt sidecar just means rebuilding
+    try:
+        with open(sidecar, 'rb') as f:
+            cached_signature, lookup = pickle.load(f)
+        if cached_signature == signature:
+            return lookup
+    except Exception:
+        pass
+    
+    ref = standardize_cols(pd.read_csv(reference_file))
+    required_ref = {"description", "category", "sub-category"}
+    if not required_ref.issubset(set(ref.columns)):
+        missing = required_ref - set(ref.columns)
+        raise ValueError(f"Reference file missing required columns: {missing}")
+    lookup = build_description_lookup(ref)
+    
+    # Write to a temp file and rename so a concurrent reader never sees a partial pickle
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(sidecar)), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((signature, lookup), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        pass  # read-only folder: keep working without the sidecar
+    return lookup
+
+def _mtime(path):
+    """Return the modification time of path, or None if it does not exist"""
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
 def load_and_process_data(selected_files, folder_name):
+    """Load and process budget data, keyed on the source folder's mtime"""
+    # references.csv is deliberately not part of the key: every Data Review save rewrites it,
+    # and the review page expects the loaded data to stay put until "Refresh Analysis" clears it
+    return _load_cached(
+        tuple(selected_files),
+        folder_name,
+        _mtime(os.path.abspath(folder_name)),
+    )
+
+@st.cache_data(show_spinner=False)
+def _load_cached(selected_files, folder_name, folder_mtime):
     """Load and process budget data with caching"""
     try:
         # Load source files
@@ -94,125 +208,165 @@ def load_and_process_data(selected_files, folder_name):
         if not selected_files:
             return None, None, "No files selected for processing"
         
-        # Read and combine selected source files
-        df_list = []
+        # Check every selected file exists before reading any of them
+        file_paths = []
         for filename in selected_files:
             file_path = os.path.join(absolute_path, filename)
             if not os.path.exists(file_path):
                 return None, None, f"Selected file not found: {filename}"
-            
-            temp_df = standardize_cols(pd.read_csv(file_path))
-            temp_df["source_file"] = filename
-            required_src = {"date", "description", "amount", "card"}
-            if not required_src.issubset(set(temp_df.columns)):
-                return None, None, f"Source file {filename} missing required columns: {required_src - set(temp_df.columns)}"
-            df_list.append(temp_df)
+            file_paths.append(file_path)
+        
+        # Read and validate the selected source files in parallel; the pyarrow parser
+        # releases the GIL. map() re-raises the first failure in selection order.
+        with ThreadPoolExecutor(max_workers=min(8, len(file_paths))) as executor:
+            df_list = list(executor.map(read_source_file, file_paths))
         
-        src = pd.concat(df_list, ignore_index=True)
+        if len(df_list) == 1:
+            src = df_list[0]
+        elif all(set(df.columns) == set(df_list[0].columns) for df in df_list[1:]):
+            # Matching schemas (in any column order): one allocation per column instead of
+            # one block per file per column
+            src = pd.DataFrame({
+                col: np.concatenate([df[col].to_numpy() for df in df_list])
+                for col in df_list[0].columns
+            })
+        else:
+            src = pd.concat(df_list, ignore_index=True, sort=False)
         
         # Load reference file
         reference_file = "references.csv"
         if not os.path.exists(reference_file):
             return None, None, f"Reference file not found: {reference_file}"
         
-        ref = standardize_cols(pd.read_csv(reference_file))
-        required_ref = {"description", "category", "sub-category"}
-        if not required_ref.issubset(set(ref.columns)):
-            missing = required_ref - set(ref.columns)
-            return None, None, f"Reference file missing required columns: {missing}"
-        
         # Process data
-        desc_to_pair = build_description_lookup(ref)
+        desc_to_pair = load_reference_lookup(reference_file)
         all_choices = list(desc_to_pair.keys())
-        suggestions = []
+        choice_index = {choice: i for i, choice in enumerate(all_choices)}
         
-        for _, row in src.iterrows():
-            nd = normalize(row["description"])
-            cat = None
-            sub = None
-            match_type = "none"
-            match_desc = None
-            match_score = 0.0
-            
-            # Exact match
-            if nd in desc_to_pair and all(v is not None for v in desc_to_pair[nd]):
-                cat, sub = desc_to_pair[nd]
-                match_type = "exact"
-                match_desc = nd
-                match_score = 100.0
-            else:
-                # Fuzzy match
-                best, score = fuzzy_best_match(nd, all_choices, threshold=90)
-                if best is not None and score >= 90 and all(v is not None for v in desc_to_pair.get(best, (None, None))):
-                    cat, sub = desc_to_pair[best]
-                    match_type = "fuzzy"
-                    match_desc = best
-                    match_score = score
-            
-            suggestion = {
-                "date": row.get("date"),
-                "description": row.get("description"),
-                "amount": row.get("amount"),
-                "card": row.get("card"),
-                "source_file": row.get("source_file"),
-                "category": cat,
-                "sub-category": sub,
-                "match_type": match_type,
-                "matched_description_norm": match_desc,
-                "match_score": round(match_score, 1),
-                "needs_review": match_type != "exact",
-                "reason": "exact" if match_type == "exact" else ("fuzzy_suggest" if match_type == "fuzzy" else "no_match"),
-            }
-            suggestions.append(suggestion)
+        # Arrays aligned with all_choices so matches are fetched by fancy-indexing.
+        # The trailing None means index -1 ("no match") resolves to None.
+        choice_descs = np.array(all_choices + [None], dtype=object)
+        choice_cats = np.array([pair[0] for pair in desc_to_pair.values()] + [None], dtype=object)
+        choice_subs = np.array([pair[1] for pair in desc_to_pair.values()] + [None], dtype=object)
+        
+        # Match each distinct normalized description once, then broadcast back to rows
+        nd_codes, nd_uniques = pd.factorize(normalize_series(src["description"]))
+        unique_nd = nd_uniques.tolist()
+        
+        # Exact matches are a dict lookup
+        unique_idx = np.fromiter((choice_index.get(d, -1) for d in unique_nd), dtype=np.intp, count=len(unique_nd))
+        unique_exact = unique_idx >= 0
+        unique_score = np.where(unique_exact, 100.0, 0.0)
+        
+        # Only descriptions without an exact match go through fuzzy scoring
+        fuzzy_uniques = np.flatnonzero(~unique_exact)
+        unique_idx[fuzzy_uniques], unique_score[fuzzy_uniques] = fuzzy_best_matches(
+            [unique_nd[i] for i in fuzzy_uniques], all_choices, threshold=90
+        )
+        
+        exact_mask = unique_exact[nd_codes]
+        choice_idx = unique_idx[nd_codes]
+        match_score = unique_score[nd_codes]
+        # 0 = exact, 1 = fuzzy, 2 = none; the label columns are fancy-indexed from this once
+        match_kind = np.where(exact_mask, 0, np.where(choice_idx >= 0, 1, 2))
+        match_type = np.array(["exact", "fuzzy", "none"], dtype=object)[match_kind]
+        category = choice_cats[choice_idx]
+        subcategory = choice_subs[choice_idx]
+        match_desc = choice_descs[choice_idx]
+        
+        suggest_df = pd.DataFrame({
+            "date": src["date"].to_numpy(),
+            "description": src["description"].to_numpy(),
+            "amount": src["amount"].to_numpy(),
+            "card": src["card"].to_numpy(),
+            "source_file": src["source_file"].to_numpy(),
+            "category": category,
+            "sub-category": subcategory,
+            "match_type": match_type,
+            "matched_description_norm": match_desc,
+            "match_score": match_score.round(1),
+            "needs_review": match_kind != 0,
+            "reason": np.array(["exact", "fuzzy_suggest", "no_match"], dtype=object)[match_kind],
+        })
+        
+        # Store the low-cardinality label columns as categoricals
+        for col in ("match_type", "category", "sub-category", "source_file", "card", "reason"):
+            suggest_df[col] = suggest_df[col].astype("category")
+        
+        # Match scores are 0-100 with one decimal, so float32 is plenty
+        suggest_df["match_score"] = pd.to_numeric(suggest_df["match_score"], downcast="float")
         
-        suggest_df = pd.DataFrame(suggestions)
         return src, suggest_df, None
         
     except Exception as e:
         return None, None, str(e)
 
+@st.cache_data(show_spinner=False)
+def _reference_index(ref_mtime):
+    """Return the references.csv header and a lowercased description -> first row index map, cached on file mtime"""
+    if ref_mtime is None:
+        return [], {}
+    ref_df = pd.read_csv("references.csv")
+    descriptions = standardize_cols(ref_df)['description'].dropna().astype(str)
+    keys = descriptions.str.lower().str.strip().drop_duplicates()
+    return list(ref_df.columns), dict(zip(keys, keys.index))
+
+def _read_json(path):
+    """Parse a JSON file, with orjson when it is installed"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _insort(items, item, key=None):
+    """Insert item into items keeping it sorted; a list that isn't sorted yet (e.g. hand-edited) is sorted in full"""
+    keys = items if key is None else [key(x) for x in items]
+    if all(a <= b for a, b in zip(keys, keys[1:])):
+        # bisect on the precomputed keys (insort's own key= needs Python 3.10)
+        items.insert(bisect.bisect_right(keys, item if key is None else key(item)), item)
+    else:
+        items.append(item)
+        items.sort(key=key)
+
 def update_references_file(description, category, subcategory):
     """Update both references.csv and categories.json files with new categorization"""
     
     # 1. Update references.csv
     ref_file = "references.csv"
+    header, desc_index = _reference_index(_mtime(ref_file))
+    row_idx = desc_index.get(description.lower().strip())
+    new_values = {'description': description, 'category': category, 'sub-category': subcategory}
     
-    # Read existing references
-    if os.path.exists(ref_file):
-        ref_df = pd.read_csv(ref_file)
-    else:
-        # Create new references file if it doesn't exist
-        ref_df = pd.DataFrame(columns=['description', 'category', 'sub-category'])
-    
-    # Standardize columns
-    ref_df = standardize_cols(ref_df)
-    
-    # Check if description already exists
-    existing_row = ref_df[ref_df['description'].str.lower().str.strip() == description.lower().strip()]
-    
-    if len(existing_row) > 0:
-        # Update existing row
-        ref_df.loc[existing_row.index[0], 'category'] = category
-        ref_df.loc[existing_row.index[0], 'sub-category'] = subcategory
+    if row_idx is not None:
+        # Existing description: update its row with a single indexer call and rewrite
+        ref_df = standardize_cols(pd.read_csv(ref_file))
+        ref_df.loc[row_idx, ['category', 'sub-category']] = [category, subcategory]
+        ref_df.to_csv(ref_file, index=False)
+    elif set(new_values).issubset(c.strip().lower() for c in header):
+        # New description: append one line instead of rewriting the whole file
+        with open(ref_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b'\n', b'\r')
+        # Match to_csv, which writes UTF-8 with os.linesep line endings
+        with open(ref_file, 'a', newline='', encoding='utf-8') as f:
+            if needs_newline:
+                f.write(os.linesep)
+            csv.writer(f, lineterminator=os.linesep).writerow([new_values.get(c.strip().lower(), '') for c in header])
     else:
-        # Add new row
-        new_row = pd.DataFrame({
-            'description': [description],
-            'category': [category],
-            'sub-category': [subcategory]
-        })
-        ref_df = pd.concat([ref_df, new_row], ignore_index=True)
-    
-    # Save updated references
-    ref_df.to_csv(ref_file, index=False)
+        # No usable references.csv yet: write one with the new row
+        if os.path.exists(ref_file):
+            ref_df = standardize_cols(pd.read_csv(ref_file))
+        else:
+            ref_df = pd.DataFrame(columns=['description', 'category', 'sub-category'])
+        ref_df = pd.concat([ref_df, pd.DataFrame({k: [v] for k, v in new_values.items()})], ignore_index=True)
+        ref_df.to_csv(ref_file, index=False)
+    _reference_index.clear()
     
     # 2. Update categories.json if new category or subcategory
     categories_file = "categories.json"
     
     # Load existing categories
     if os.path.exists(categories_file):
-        with open(categories_file, 'r') as f:
-            categories_data = json.load(f)
+        categories_data = _read_json(categories_file)
     else:
         categories_data = {"categories": []}
     
@@ -223,79 +377,90 @@ def update_references_file(description, category, subcategory):
             category_found = True
             # Add subcategory if it doesn't exist
             if subcategory not in cat_info.get('subcategories', []):
-                cat_info['subcategories'].append(subcategory)
-                cat_info['subcategories'] = sorted(cat_info['subcategories'])
+                _insort(cat_info['subcategories'], subcategory)
             break
     
     # Add new category if not found
     if not category_found:
-        categories_data['categories'].append({
+        # Keep categories sorted alphabetically
+        _insort(categories_data['categories'], {
             "category": category,
             "subcategories": [subcategory]
-        })
-        # Sort categories alphabetically
-        categories_data['categories'] = sorted(categories_data['categories'], key=lambda x: x['category'])
+        }, key=lambda x: x['category'])
     
-    # Save updated categories
+    # Save updated categories (stdlib json keeps the file's 4-space layout; orjson only does 2)
     with open(categories_file, 'w') as f:
         json.dump(categories_data, f, indent=4)
+    # Don't rely on the mtime key alone: two saves inside the filesystem's timestamp
+    # resolution would otherwise serve the stale cached categories
+    _load_categories.clear()
     
     return True
 
-def create_expense_charts(suggest_df):
-    """Create expense breakdown charts"""
-    reviewed_df = suggest_df[suggest_df["needs_review"] == False]
+@st.cache_data(show_spinner=False)
+def _load_categories(categories_mtime):
+    """Load sorted category names and their sub-categories, cached on file mtime"""
+    categories_file = "categories.json"
+    existing_categories = []
+    existing_subcategories = {}
     
-    if len(reviewed_df) == 0:
-        return None
+    if categories_mtime is None:
+        return (), existing_subcategories
     
-    # Compute totals
-    cat_totals = reviewed_df.groupby("category")["amount"].sum().sort_values(ascending=False)
-    subcat_totals = reviewed_df.groupby(["category", "sub-category"])["amount"].sum()
+    categories_data = _read_json(categories_file)
     
-    # Create figure
-    fig = plt.figure(figsize=(12, 10))
-    gs = fig.add_gridspec(3, 2)
+    for cat_info in categories_data.get('categories', []):
+        category = cat_info.get('category')
+        subcategories = cat_info.get('subcategories', [])
+        if category:
+            existing_categories.append(category)
+            existing_subcategories[category] = subcategories
     
-    # Main overall pie chart
-    ax_main = fig.add_subplot(gs[0, :], aspect='equal')
-    wedges, texts, autotexts = ax_main.pie(
-        cat_totals,
-        labels=cat_totals.index,
-        autopct=lambda p: f'{p:.1f}%\n(${p*cat_totals.sum()/100:.2f})',
-        startangle=90,
-        wedgeprops=dict(width=0.5)
+    # Sort once here; callers reuse the cached tuple on every rerun
+    return tuple(sorted(existing_categories)), existing_subcategories
+
+def donut_chart(totals: pd.Series, label: str, title) -> alt.Chart:
+    """Build a donut chart of totals (indexed by label) with amount and share tooltips"""
+    data = pd.DataFrame({label: totals.index.astype(str), "amount": totals.to_numpy()})
+    data["share"] = data["amount"] / data["amount"].sum()
+    return alt.Chart(data, title=title).mark_arc(innerRadius=60).encode(
+        theta=alt.Theta("amount:Q", stack=True),
+        color=alt.Color(f"{label}:N", sort=data[label].tolist()),
+        order=alt.Order("amount:Q", sort="descending"),
+        tooltip=[
+            alt.Tooltip(f"{label}:N"),
+            alt.Tooltip("amount:Q", format="$,.2f"),
+            alt.Tooltip("share:Q", format=".1%"),
+        ],
     )
-    ax_main.set_title("Overall Expenses by Category", fontsize=14, fontweight='bold')
+
+@st.cache_data(show_spinner=False)
+def create_expense_charts(reviewed_df):
+    """Create expense breakdown charts for the reviewed transactions: the overall
+    category donut followed by sub-category donuts for the top 4 categories"""
+    if len(reviewed_df) == 0:
+        return None
     
-    # Subcategory pies (top 4 categories)
-    top_categories = cat_totals.head(4).index.tolist()
-    for i, cat in enumerate(top_categories):
-        row = 1 + i // 2
-        col = i % 2
-        ax = fig.add_subplot(gs[row, col], aspect='equal')
-        subs = subcat_totals.loc[cat].sort_values(ascending=False)
-        
-        wedges, texts, autotexts = ax.pie(
-            subs,
-            labels=subs.index,
-            autopct=lambda p: f'{p:.1f}%\n(${p*subs.sum()/100:.2f})',
-            startangle=90,
-            wedgeprops=dict(width=0.5)
-        )
-        ax.set_title(f"{cat}\nTotal ${subs.sum():.2f}", fontsize=12, fontweight='bold')
+    # Compute totals (category totals are rolled up from the sub-category totals)
+    subcat_totals = reviewed_df.groupby(["category", "sub-category"], observed=True)["amount"].sum()
+    cat_totals = subcat_totals.groupby(level=0, observed=True).sum().sort_values(ascending=False)
     
-    plt.suptitle("Expense Breakdown by Category and Sub-Category", fontsize=16, fontweight='bold')
-    plt.tight_layout(rect=[0, 0, 1, 0.95])
+    # Charts are rendered client-side by Streamlit, so no figure is rasterized on the server
+    charts = [donut_chart(cat_totals, "category", "Overall Expenses by Category")]
     
-    return fig
+    # Subcategory donuts (top 4 categories)
+    for cat in cat_totals.head(4).index:
+        subs = subcat_totals.loc[cat].sort_values(ascending=False)
+        charts.append(donut_chart(subs, "sub-category", [str(cat), f"Total ${subs.sum():,.2f}"]))
+    
+    return charts
 
 # Main app
 st.title("💰 Personal Budget Tracker")
 
 # Folder Selection Section
 st.sidebar.title("📁 Folder Selection")
-available_folders = get_available_folders()
+available_folders = get_available_folders(os.getcwd())
 
 if not available_folders:
     st.sidebar.error("No folders found in the current directory")
@@ -313,7 +478,7 @@ selected_folder = st.sidebar.selectbox(
 
 # File Selection Section
 st.sidebar.title("📂 File Selection")
-available_files = get_available_files(selected_folder)
+available_files = get_available_files(selected_folder, os.getcwd())
 
 if not available_files:
     st.sidebar.error(f"No CSV files found in '{selected_folder}' folder")
@@ -392,6 +557,10 @@ if error:
     st.info("2. A 'references.csv' file with: description, category, sub-category")
     st.stop()
 
+# Compute the needs-review mask and the reviewed rows once per rerun and share them across pages
+review_mask = suggest_df["needs_review"].to_numpy(dtype=bool)
+reviewed_df = suggest_df[~review_mask]
+
 if page == "Dashboard":
     st.header("📊 Dashboard")
     
@@ -399,11 +568,12 @@ if page == "Dashboard":
         # Show file processing info
         st.info(f"Processing {len(selected_files)} selected file(s) from '{selected_folder}' folder: {', '.join(selected_files)}")
         
-        # Calculate metrics
+        # Calculate metrics from one pass over needs_review
+        review_stats = suggest_df.groupby("needs_review")["amount"].agg(["size", "sum"])
         total_transactions = len(suggest_df)
-        total_amount = suggest_df["amount"].sum()
-        reviewed_count = len(suggest_df[suggest_df["needs_review"] == False])
-        needs_review_count = len(suggest_df[suggest_df["needs_review"] == True])
+        total_amount = review_stats["sum"].sum()
+        reviewed_count = int(review_stats["size"].get(False, 0))
+        needs_review_count = int(review_stats["size"].get(True, 0))
         
         # Display metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -424,7 +594,7 @@ if page == "Dashboard":
         
         # File breakdown
         st.subheader("📁 File Breakdown")
-        file_summary = suggest_df.groupby("source_file").agg({
+        file_summary = suggest_df.groupby("source_file", observed=True).agg({
             "amount": ["sum", "count"]
         }).round(2)
         file_summary.columns = ["Total Amount", "Transaction Count"]
@@ -434,17 +604,16 @@ elif page == "Transaction Analysis":
     st.header("💳 Transaction Analysis")
     
     if suggest_df is not None:
-        # Show categorized transactions
-        reviewed_df = suggest_df[suggest_df["needs_review"] == False]
+        # Show categorized transactions (a read-only projection, no copy needed)
+        display_df = reviewed_df[["date", "description", "amount", "category", "sub-category", "match_type", "source_file"]]
         
-        if len(reviewed_df) > 0:
+        if len(display_df) > 0:
             st.subheader("Categorized Transactions")
-            display_df = reviewed_df[["date", "description", "amount", "category", "sub-category", "match_type", "source_file"]].copy()
             st.dataframe(display_df, use_container_width=True)
             
             # Category breakdown
             st.subheader("Category Breakdown")
-            cat_summary = reviewed_df.groupby("category")["amount"].agg(["sum", "count"]).round(2)
+            cat_summary = display_df.groupby("category", observed=True)["amount"].agg(["sum", "count"]).round(2)
             cat_summary.columns = ["Total Amount", "Transaction Count"]
             cat_summary = cat_summary.sort_values("Total Amount", ascending=False)
             st.dataframe(cat_summary, use_container_width=True)
@@ -455,133 +624,135 @@ elif page == "Data Review":
     st.header("🔍 Data Review")
     
     if suggest_df is not None:
-        needs_review_df = suggest_df[suggest_df["needs_review"] == True]
+        review_count = int(review_mask.sum())
+        needs_review_df = suggest_df[review_mask]
         
-        if len(needs_review_df) > 0:
+        if review_count > 0:
             st.subheader("Transactions Needing Review")
-            st.write(f"Found {len(needs_review_df)} transactions that need manual review:")
+            st.write(f"Found {review_count} transactions that need manual review:")
             
             # Initialize session state for tracking updates
             if 'updated_transactions' not in st.session_state:
                 st.session_state.updated_transactions = {}
             if 'show_success' not in st.session_state:
                 st.session_state.show_success = False
+            # Alias the dict once; it is mutated in place, so writes still land in session state
+            updated_transactions = st.session_state.updated_transactions
             
             # Get existing categories from categories.json
-            categories_file = "categories.json"
-            existing_categories = []
-            existing_subcategories = {}
-            
-            if os.path.exists(categories_file):
-                with open(categories_file, 'r') as f:
-                    categories_data = json.load(f)
-                
-                for cat_info in categories_data.get('categories', []):
-                    category = cat_info.get('category')
-                    subcategories = cat_info.get('subcategories', [])
-                    if category:
-                        existing_categories.append(category)
-                        existing_subcategories[category] = subcategories
-                
-                existing_categories = sorted(existing_categories)
+            existing_categories, existing_subcategories = _load_categories(_mtime("categories.json"))
             
             # Show transaction editor as table
             st.markdown("### Edit Transactions")
             
-            # Create editable table
-            if len(needs_review_df) > 0:
-                # Display transactions in a table with edit controls
-                for i, (idx, row) in enumerate(needs_review_df.iterrows()):
-                    st.markdown(f"#### Transaction {i+1}")
-                    
-                    # Create columns for the table-like layout
-                    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                    
-                    with col1:
-                        st.markdown("**Transaction Details:**")
-                        st.write(f"📅 **Date:** {row['date']}")
-                        st.write(f"💳 **Description:** {row['description']}")
-                        st.write(f"💰 **Amount:** ${row['amount']:.2f}")
-                        st.write(f"📁 **File:** {row['source_file']}")
-                        st.write(f"🔍 **Reason:** {row['reason']}")
-                        if row['match_score'] > 0:
-                            st.write(f"📊 **Match Score:** {row['match_score']}%")
+            # Build the selectbox option lists once, keyed by category for O(1) lookup
+            category_options = ["Select Category", "Add New Category", *existing_categories]
+            default_subcat_options = ["Select Sub-Category", "Add New Sub-Category"]
+            subcat_options_by_category = {
+                category: default_subcat_options + subcategories
+                for category, subcategories in existing_subcategories.items()
+            }
+            
+            # Page through the transactions 20 at a time so every one can be reached
+            page_size = 20
+            page_count = (review_count + page_size - 1) // page_size
+            # Clamp a page left over from a larger review set before the widget reads it
+            if st.session_state.get("review_page", 1) > page_count:
+                st.session_state.review_page = page_count
+            review_page = st.number_input(
+                f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key="review_page"
+            )
+            start = (review_page - 1) * page_size
+            
+            # Show the read-only details of this page's transactions as a single table
+            view = needs_review_df.iloc[start:start + page_size][["date", "description", "amount", "source_file", "reason", "match_score"]]
+            st.dataframe(
+                view.set_axis(range(start + 1, start + len(view) + 1)),
+                use_container_width=True,
+                column_config={
+                    "amount": st.column_config.NumberColumn("amount", format="$%.2f"),
+                    "match_score": st.column_config.NumberColumn("match_score", format="%.1f%%"),
+                },
+            )
+            
+            # Column headings for the edit controls
+            col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+            col1.markdown("**Transaction:**")
+            col2.markdown("**Category:**")
+            col3.markdown("**Sub-Category:**")
+            col4.markdown("**Action:**")
+            
+            # Render only the editable controls per row, numbered to match the table
+            for i, (idx, description) in enumerate(view["description"].items()):
+                col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+                col1.write(f"**{start + i + 1}.** {description}")
+                
+                with col2:
+                    # Category selection/input
+                    selected_cat_option = st.selectbox(
+                        "Choose Category",
+                        options=category_options,
+                        key=f"cat_select_{idx}",
+                        label_visibility="collapsed"
+                    )
                     
-                    with col2:
-                        st.markdown("**Category:**")
-                        # Category selection/input
-                        category_options = ["Select Category", "Add New Category"] + existing_categories
-                        selected_cat_option = st.selectbox(
-                            "Choose Category",
-                            options=category_options,
-                            key=f"cat_select_{idx}",
-                            label_visibility="collapsed"
+                    if selected_cat_option == "Add New Category":
+                        new_category = st.text_input(
+                            "Enter new category:",
+                            key=f"new_cat_{idx}",
+                            placeholder="e.g., Food, Transportation"
                         )
-                        
-                        if selected_cat_option == "Add New Category":
-                            new_category = st.text_input(
-                                "Enter new category:",
-                                key=f"new_cat_{idx}",
-                                placeholder="e.g., Food, Transportation"
-                            )
-                            final_category = new_category if new_category else None
-                        elif selected_cat_option != "Select Category":
-                            final_category = selected_cat_option
-                        else:
-                            final_category = None
+                        final_category = new_category if new_category else None
+                    elif selected_cat_option != "Select Category":
+                        final_category = selected_cat_option
+                    else:
+                        final_category = None
+                
+                with col3:
+                    # Sub-category selection/input
+                    subcat_options = subcat_options_by_category.get(final_category, default_subcat_options)
                     
-                    with col3:
-                        st.markdown("**Sub-Category:**")
-                        # Sub-category selection/input
-                        if final_category and final_category in existing_subcategories:
-                            subcat_options = ["Select Sub-Category", "Add New Sub-Category"] + existing_subcategories[final_category]
-                        else:
-                            subcat_options = ["Select Sub-Category", "Add New Sub-Category"]
-                        
-                        selected_subcat_option = st.selectbox(
-                            "Choose Sub-Category",
-                            options=subcat_options,
-                            key=f"subcat_select_{idx}",
-                            label_visibility="collapsed"
+                    selected_subcat_option = st.selectbox(
+                        "Choose Sub-Category",
+                        options=subcat_options,
+                        key=f"subcat_select_{idx}",
+                        label_visibility="collapsed"
+                    )
+                    
+                    if selected_subcat_option == "Add New Sub-Category":
+                        new_subcategory = st.text_input(
+                            "Enter new sub-category:",
+                            key=f"new_subcat_{idx}",
+                            placeholder="e.g., Groceries, Gas"
                         )
-                        
-                        if selected_subcat_option == "Add New Sub-Category":
-                            new_subcategory = st.text_input(
-                                "Enter new sub-category:",
-                                key=f"new_subcat_{idx}",
-                                placeholder="e.g., Groceries, Gas"
-                            )
-                            final_subcategory = new_subcategory if new_subcategory else None
-                        elif selected_subcat_option != "Select Sub-Category":
-                            final_subcategory = selected_subcat_option
+                        final_subcategory = new_subcategory if new_subcategory else None
+                    elif selected_subcat_option != "Select Sub-Category":
+                        final_subcategory = selected_subcat_option
+                    else:
+                        final_subcategory = None
+                
+                with col4:
+                    # Update button for each transaction
+                    if st.button("💾 Update", key=f"update_{idx}", help="Save categorization"):
+                        if final_category and final_subcategory:
+                            # Update the transaction in session state
+                            updated_transactions[idx] = {
+                                'category': final_category,
+                                'sub-category': final_subcategory,
+                                'description': description
+                            }
+                            
+                            # Update references.csv
+                            update_references_file(description, final_category, final_subcategory)
+                            
+                            st.success(f"✅ {final_category} → {final_subcategory}")
+                            st.session_state.show_success = True
                         else:
-                            final_subcategory = None
-                    
-                    with col4:
-                        st.markdown("**Action:**")
-                        # Update button for each transaction
-                        if st.button("💾 Update", key=f"update_{idx}", help="Save categorization"):
-                            if final_category and final_subcategory:
-                                # Update the transaction in session state
-                                st.session_state.updated_transactions[idx] = {
-                                    'category': final_category,
-                                    'sub-category': final_subcategory,
-                                    'description': row['description']
-                                }
-                                
-                                # Update references.csv
-                                update_references_file(row['description'], final_category, final_subcategory)
-                                
-                                st.success(f"✅ {final_category} → {final_subcategory}")
-                                st.session_state.show_success = True
-                            else:
-                                st.error("❌ Select both fields")
-                    
-                    # Add a separator between transactions
-                    st.divider()
+                            st.error("❌ Select both fields")
+
             
             # Show updated transactions summary
-            if st.session_state.updated_transactions:
+            if updated_transactions:
                 st.markdown("### 📊 Recently Updated Transactions")
                 updated_df = pd.DataFrame([
                     {
@@ -589,7 +760,7 @@ elif page == "Data Review":
                         'Category': data['category'],
                         'Sub-Category': data['sub-category']
                     }
-                    for data in st.session_state.updated_transactions.values()
+                    for data in updated_transactions.values()
                 ])
                 st.dataframe(updated_df, use_container_width=True)
                 
@@ -600,13 +771,14 @@ elif page == "Data Review":
                     st.rerun()
             
             # Show unresolved transactions
-            unresolved_count = len(needs_review_df) - len(st.session_state.updated_transactions)
+            unresolved_count = review_count - len(updated_transactions)
             if unresolved_count > 0:
                 st.info(f"📋 {unresolved_count} transactions still need review")
             
             # Show reasons breakdown
             st.subheader("Review Reasons Breakdown")
             reason_counts = needs_review_df["reason"].value_counts()
+            reason_counts = reason_counts[reason_counts > 0]  # categorical counts include unused reasons
             st.bar_chart(reason_counts)
             
         else:
@@ -616,36 +788,44 @@ elif page == "Data Review":
 elif page == "Data_review_VG":
     st.header("🔍 Data Review VG")
     if suggest_df is not None:
-        needs_review_df = suggest_df[suggest_df["needs_review"] == True]
-        st.data_editor(needs_review_df, use_container_width=True,column_config={"category":st.column_config.SelectboxColumn("category",options=[""])},column_order=["date","description","amount","card","category","sub-category"],disabled=["date","description","amount","card"])
+        # Only send the columns the editor shows instead of the whole frame
+        editor_cols = ["date","description","amount","card","category","sub-category"]
+        # The editor writes cells back with .iat, which a categorical rejects for new labels
+        needs_review_df = suggest_df.loc[review_mask, editor_cols].astype({"category": object, "sub-category": object})
+        st.data_editor(needs_review_df, use_container_width=True,column_config={"category":st.column_config.SelectboxColumn("category",options=[""])},column_order=editor_cols,disabled=["date","description","amount","card"])
 elif page == "Analytics":
     st.header("📈 Budget Analytics")
     
     if suggest_df is not None:
-        reviewed_df = suggest_df[suggest_df["needs_review"] == False]
-        
         if len(reviewed_df) > 0:
             # Create and display charts
-            fig = create_expense_charts(suggest_df)
-            if fig:
-                st.pyplot(fig)
+            charts = create_expense_charts(reviewed_df)
+            if charts:
+                st.subheader("Expense Breakdown by Category and Sub-Category")
+                st.altair_chart(charts[0], use_container_width=True)
+                chart_cols = st.columns(2)
+                for i, chart in enumerate(charts[1:]):
+                    with chart_cols[i % 2]:
+                        st.altair_chart(chart, use_container_width=True)
             
             # Additional analytics
             st.subheader("Spending Insights")
             
+            # A single group-by feeds both top-5 lists
+            cat_stats = reviewed_df.groupby("category", observed=True)["amount"].agg(["sum", "size"])
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 st.write("**Top 5 Categories by Amount:**")
-                cat_totals = reviewed_df.groupby("category")["amount"].sum().sort_values(ascending=False).head()
-                for cat, amount in cat_totals.items():
-                    st.write(f"• {cat}: ${amount:,.2f}")
+                cat_totals = cat_stats["sum"].nlargest(5)
+                # Escape "$" so several amounts in one block are not read as LaTeX
+                st.markdown("\n".join(f"- {cat}: \\${amount:,.2f}" for cat, amount in cat_totals.items()))
             
             with col2:
                 st.write("**Top 5 Most Frequent Categories:**")
-                cat_counts = reviewed_df["category"].value_counts().head()
-                for cat, count in cat_counts.items():
-                    st.write(f"• {cat}: {count} transactions")
+                cat_counts = cat_stats["size"].nlargest(5)
+                st.markdown("\n".join(f"- {cat}: {count} transactions" for cat, count in cat_counts.items()))
         else:
             st.info("No categorized data available for analytics. Please review transactions first.")
 
@@ -2,11 +2,12 @@
 import pandas as pd 
 import numpy as np 
 import re
-from collections import Counter, defaultdict
+from functools import lru_cache
 from typing import Dict, Tuple, Optional, List
 from rapidfuzz import process, fuzz # pip install rapidfuzz
 import matplotlib.pyplot as plt
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # display related imports
 from IPython.display import display, HTML, clear_output
@@ -15,51 +16,111 @@ from datetime import datetime
 
 # helper functions
 def standardize_cols(df: pd.DataFrame) -> pd.DataFrame:
-	lower_map = {c: c.strip().lower() for c in df.columns}
-	df = df.rename(columns=lower_map)
+	# set_axis returns a new frame, so callers' frames keep their original headers
+	df = df.set_axis(df.columns.str.strip().str.lower(), axis=1)
 	# # normalize common variants
 	# if "sub_category" in df.columns and "sub-category" not in df.columns:
 	# 	df = df.rename(columns={"sub_category": "sub-category"})
 	return df
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+
+@lru_cache(maxsize=65536)
+def _normalize_cached(text: str) -> str:
+    # Statements repeat the same merchants, so most calls are cache hits
+    t = _PUNCT_RE.sub(" ", text.strip().lower())         # remove punctuation
+    return _WS_RE.sub(" ", t).strip()         # collapse spaces
+
 def normalize(text: str) -> str:
     if not isinstance(text, str):
         text = "" if pd.isna(text) else str(text)
-    t = text.strip().lower()
-    t = re.compile(r"[^\w\s]").sub(" ", t)         # remove punctuation
-    t = re.compile(r"\s+").sub(" ", t)         # collapse spaces
-    return t.strip()
-
-def most_common_pair(pairs: List[Tuple[str, str]]) -> Tuple[Optional[str], Optional[str]]:
-    if not pairs:
-        return None, None
-    counter = Counter(pairs)
-    (cat, subcat), _ = counter.most_common(1)[0]
-    return cat, subcat
+    return _normalize_cached(text)
+
+def normalize_series(s: pd.Series) -> pd.Series:
+    # Run normalize() once per distinct value; missing values (code -1) pick the trailing ""
+    codes, uniques = pd.factorize(s)
+    normalized = np.array([normalize(u) for u in uniques] + [""], dtype=object)
+    return pd.Series(normalized[codes], index=s.index, dtype=object)
+
+def lnrm(nd: str) -> str:
+    # Even more aggressive than normalize: alphanumerics only, so "amzn mktp us" == "amznmktpus"
+    return _NON_ALNUM_RE.sub("", nd)
 
 def build_description_lookup(dest_df: pd.DataFrame) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
     # Group by normalized description and take the most common (category, sub-category) pair
-    pairs_by_desc: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
-    for _, row in dest_df.iterrows():
-        nd = normalize(row.get("description", ""))
-        cat = row.get("category")
-        sub = row.get("sub-category") if "sub-category" in row else row.get("sub_category")
-        if pd.notna(cat) and pd.notna(sub):
-            pairs_by_desc[nd].append((str(cat), str(sub)))
-    lookup: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
-    for nd, pairs in pairs_by_desc.items():
-        lookup[nd] = most_common_pair(pairs)
-    return lookup
-
-def fuzzy_best_match(query: str, choices: List[str], threshold: int = 90) -> Tuple[Optional[str], float]:
-    if not choices:
-        return None, 0.0
-       # Using token_set_ratio helps with word order/duplication
-    match = process.extractOne(query, choices, scorer=fuzz.token_set_ratio)
-    if match is None:
-        return None, 0.0
-    choice, score, _ = match
-    return choice, float(score)
+    sub_col = "sub-category" if "sub-category" in dest_df.columns else "sub_category"
+    if sub_col not in dest_df.columns:
+        return {}
+    # Drop rows missing a category or sub-category first, so only kept rows get normalized
+    labeled = dest_df.dropna(subset=["category", sub_col])
+    pairs = pd.DataFrame({
+        "nd": normalize_series(labeled["description"]),
+        "category": labeled["category"].astype(str),
+        "sub": labeled[sub_col].astype(str),
+    })
+    
+    # Groups come out in first-seen order; a stable sort by count then keeps the
+    # first-seen pair on ties, the same pick Counter.most_common would make
+    counts = pairs.groupby(["nd", "category", "sub"], sort=False).size()
+    top = counts.sort_values(ascending=False, kind="stable")
+    top = top[~top.index.get_level_values("nd").duplicated()]
+    best = {nd: (cat, sub) for nd, cat, sub in top.index}
     
+    # Keep keys in first-seen order; fuzzy matching breaks score ties by choice order
+    return {nd: best[nd] for nd in pairs["nd"].unique()}
+
+def fuzzy_best_matches(queries: List[str], choices: List[str], threshold: int = 90, batch_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+    """Score all queries against all choices with process.cdist and return the best
+    choice index and score per query. Queries with no choice scoring >= threshold get index -1."""
+    best_idx = np.full(len(queries), -1, dtype=np.intp)
+    best_score = np.zeros(len(queries))
+    if not queries or not choices:
+        return best_idx, best_score
+    
+    # Score in batches so the (queries x choices) matrix stays bounded in memory. float32 halves
+    # it without reordering scores; uint8 would round near scores into ties and flip argmax picks.
+    # Using token_set_ratio helps with word order/duplication
+    for start in range(0, len(queries), batch_size):
+        # Both sides are already normalize()d, so skip rapidfuzz's preprocessing callback
+        scores = process.cdist(
+            queries[start:start + batch_size], choices,
+            scorer=fuzz.token_set_ratio, processor=None, score_cutoff=threshold, dtype=np.float32, workers=-1,
+        )
+        rows = np.arange(scores.shape[0])
+        idx = scores.argmax(axis=1)
+        top = scores[rows, idx]
+        matched = top >= threshold
+        best_idx[start:start + len(rows)] = np.where(matched, idx, -1)
+        best_score[start:start + len(rows)] = np.where(matched, top, 0.0)
+    return best_idx, best_score
+    
+# absolute reference file path -> (mtime, lookup); re-running main() only re-parses a changed file
+_ref_cache: Dict[str, Tuple[float, Dict[str, Tuple[Optional[str], Optional[str]]]]] = {}
+
+def load_reference_lookup(reference_file: str) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    reference_file = os.path.abspath(reference_file)
+    mtime = os.path.getmtime(reference_file)
+    hit = _ref_cache.get(reference_file)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    ref = standardize_cols(pd.read_csv(reference_file))
+    required_ref = { "description", "category", "sub-category"}
+    if not required_ref.issubset(set(ref.columns)):
+        missing = required_ref - set(ref.columns)
+        raise ValueError(f"Destination file missing required columns: {missing}")
+    desc_to_pair = build_description_lookup(ref)
+    _ref_cache[reference_file] = (mtime, desc_to_pair)
+    return desc_to_pair
+
+def read_source_file(file: str) -> pd.DataFrame:
+    temp_df = standardize_cols(pd.read_csv(file))
+    temp_df["source_file"] = os.path.basename(file)   # optional: track origin
+    required_src = {"date", "description", "amount", "card"}
+    if not required_src.issubset(set(temp_df.columns)):
+        raise ValueError(f"Source file must contain columns {required_src}. Found: {list(temp_df.columns)}")
+    return temp_df
+
 def main():
 	relative_path = 'Source files'
 	absolute_path = os.path.abspath(relative_path)
@@ -67,15 +128,10 @@ def main():
 	# Collect all CSV file paths
 	csv_files = [os.path.join(absolute_path, f) for f in os.listdir(absolute_path) if f.lower().endswith(".csv")]
 
-	# Read and combine
-	df_list = []
-	for file in csv_files:
-		temp_df = standardize_cols(pd.read_csv(file))
-		temp_df["source_file"] = os.path.basename(file)   # optional: track origin
-		required_src = {"date", "description", "amount", "card"}
-		if not required_src.issubset(set(temp_df.columns)):
-			raise ValueError(f"Source file must contain columns {required_src}. Found: {list(temp_df.columns)}")
-		df_list.append(temp_df)
+	# Read and combine; the C parser releases the GIL, so files are read in parallel.
+	# map() re-raises the first failing file in listing order.
+	with ThreadPoolExecutor(max_workers=max(1, min(8, len(csv_files)))) as executor:
+		df_list = list(executor.map(read_source_file, csv_files))
 
 	# Concatenate into one unified DataFrame
 	src = pd.concat(df_list, ignore_index=True)
@@ -84,56 +140,63 @@ def main():
 	# src.head()
 
 	referene_file = "references.csv" 
-	ref = standardize_cols(pd.read_csv(referene_file))
-	required_ref = { "description", "category", "sub-category"}
-	if not required_ref.issubset(set(ref.columns)):
-		missing = required_ref - set(ref.columns)
-		raise ValueError(f"Destination file missing required columns: {missing}")
-	# ref.head()
 	# Build lookup for exact description -> (category, subcat)
-	desc_to_pair = build_description_lookup(ref)
+	desc_to_pair = load_reference_lookup(referene_file)
 	all_choices = list(desc_to_pair.keys())
-	suggestions = []
-	# fuzzy logic to categorize expenses
-	for _, row in src.iterrows():
-			nd = normalize(row["description"])
-			cat = None
-			sub = None
-			match_type = "none"
-			match_desc = None
-			match_score = 0.0
-
-			# Exact
-			if nd in desc_to_pair and all(v is not None for v in desc_to_pair[nd]):
-				cat, sub = desc_to_pair[nd]
-				match_type = "exact"
-				match_desc = nd
-				match_score = 100.0
-			else:
-				# Fuzzy
-				best, score = fuzzy_best_match(nd, all_choices, threshold=90)
-				if best is not None and score >= 90 and all(v is not None for v in desc_to_pair.get(best, (None, None))):
-					cat, sub = desc_to_pair[best]
-					match_type = "fuzzy"
-					match_desc = best
-					match_score = score
-
-			suggestion = {
-				"date": row.get("date"),
-				"description": row.get("description"),
-				"amount": row.get("amount"),
-				"card": row.get("card"),
-				"category": cat,
-				"sub-category": sub,
-				"match_type": match_type,
-				"matched_description_norm": match_desc,
-				"match_score": round(match_score, 1),
-				"needs_review": match_type != "exact",  # review fuzzy and none
-				"reason": "exact" if match_type == "exact" else ("fuzzy_suggest" if match_type == "fuzzy" else "no_match"),
-			}
-			suggestions.append(suggestion)
-
-	suggest_df = pd.DataFrame(suggestions)
+	choice_index = {choice: i for i, choice in enumerate(all_choices)}
+	# Spacing/punctuation variants of a choice share its lnrm key; the first choice wins
+	lnrm_index = {}
+	for i, choice in enumerate(all_choices):
+		if lnrm(choice):
+			lnrm_index.setdefault(lnrm(choice), i)
+	# Arrays aligned with all_choices so matches are fetched by fancy-indexing.
+	# The trailing None means index -1 ("no match") resolves to None.
+	choice_descs = np.array(all_choices + [None], dtype=object)
+	choice_cats = np.array([pair[0] for pair in desc_to_pair.values()] + [None], dtype=object)
+	choice_subs = np.array([pair[1] for pair in desc_to_pair.values()] + [None], dtype=object)
+
+	# Normalize once and keep the result on src; matching then works per distinct value
+	src["nd"] = normalize_series(src["description"])
+	nd_codes, nd_uniques = pd.factorize(src["nd"])
+	unique_nd = nd_uniques.tolist()
+
+	# Exact matches are a dict lookup
+	unique_idx = np.array([choice_index.get(nd, -1) for nd in unique_nd], dtype=np.intp)
+	unique_exact = unique_idx >= 0
+
+	# Then an alphanumeric-only lookup, another hash probe that catches spacing variants
+	lnrm_uniques = np.flatnonzero(~unique_exact)
+	unique_idx[lnrm_uniques] = [lnrm_index.get(lnrm(unique_nd[i]), -1) for i in lnrm_uniques]
+	unique_lnrm = ~unique_exact & (unique_idx >= 0)
+	unique_score = np.where(unique_exact | unique_lnrm, 100.0, 0.0)
+
+	# fuzzy logic to categorize expenses: only descriptions both lookups missed are scored, in one cdist pass
+	fuzzy_uniques = np.flatnonzero(unique_idx < 0)
+	unique_idx[fuzzy_uniques], unique_score[fuzzy_uniques] = fuzzy_best_matches(
+		[unique_nd[i] for i in fuzzy_uniques], all_choices, threshold=90
+	)
+
+	exact_mask = unique_exact[nd_codes]
+	lnrm_mask = unique_lnrm[nd_codes]
+	choice_idx = unique_idx[nd_codes]
+	match_score = unique_score[nd_codes]
+	# 0 = exact, 1 = lnrm, 2 = fuzzy, 3 = none; the label columns are fancy-indexed from this once
+	match_kind = np.select([exact_mask, lnrm_mask, choice_idx >= 0], [0, 1, 2], 3)
+	match_type = np.array(["exact", "lnrm", "fuzzy", "none"], dtype=object)[match_kind]
+
+	suggest_df = pd.DataFrame({
+		"date": src["date"].to_numpy(),
+		"description": src["description"].to_numpy(),
+		"amount": src["amount"].to_numpy(),
+		"card": src["card"].to_numpy(),
+		"category": choice_cats[choice_idx],
+		"sub-category": choice_subs[choice_idx],
+		"match_type": match_type,
+		"matched_description_norm": choice_descs[choice_idx],
+		"match_score": match_score.round(1).astype(np.float32),  # 0-100 with one decimal
+		"needs_review": match_kind != 0,  # review lnrm, fuzzy and none
+		"reason": np.array(["exact", "lnrm_suggest", "fuzzy_suggest", "no_match"], dtype=object)[match_kind],
+	})
 
 	# suggest_df.head()
 
@@ -143,9 +206,9 @@ def main():
 	reviewed_df = suggest_df[suggest_df["needs_review"] == False]
 	# reviewed_df.head()
 
-	# Compute totals
-	cat_totals = reviewed_df.groupby("category")["amount"].sum().sort_values(ascending=False)
+	# Compute totals (category totals are rolled up from the sub-category totals)
 	subcat_totals = reviewed_df.groupby(["category", "sub-category"])["amount"].sum()
+	cat_totals = subcat_totals.groupby(level=0).sum().sort_values(ascending=False)
 
 	# --- Prepare Figure ---
 	fig = plt.figure(figsize=(12, 10))
@@ -1,6 +1,7 @@
 import pandas as pd
+import numpy as np
 import csv
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 import re
 
@@ -16,28 +17,35 @@ def load_patterns(patterns_file: str) -> Dict[str, List[str]]:
                 patterns[card_name] = [col.strip() for col in row[1:] if col.strip()]
     return patterns
 
-def find_matching_pattern(file_content: List[str], patterns: Dict[str, List[str]]) -> Tuple[Optional[str], Optional[List[str]], int]:
+def find_matching_pattern(file_content: Iterable[str], patterns: Dict[str, List[str]]) -> Tuple[Optional[str], Optional[List[str]], int]:
     """
     Find which pattern matches the file content and return:
     - card_name: name of the matching card pattern
     - headers: the matching column headers
     - start_idx: line number where the headers were found
     """
-    for card_name, pattern_headers in patterns.items():
-        # Look through each line in the file
-        for idx, line in enumerate(file_content):
-            # Split the line into columns
-            row = [col.strip() for col in line.split(',')]
-            # Check if this line matches our pattern headers
-            if all(header in row for header in pattern_headers):
-                return card_name, pattern_headers, idx
+    # Compare lowercased header sets; empty patterns would match any line, so skip them
+    pattern_sets = {card_name: frozenset(h.lower() for h in pattern_headers)
+                    for card_name, pattern_headers in patterns.items() if pattern_headers}
+    # Look through each line once, splitting it into a set of column names
+    for idx, line in enumerate(file_content):
+        row = frozenset(col.strip().lower() for col in line.split(','))
+        matches = [card_name for card_name, headers in pattern_sets.items() if headers <= row]
+        if matches:
+            # Several patterns can fit one header line; the most specific (longest) wins,
+            # ties going to the first listed
+            card_name = max(matches, key=lambda name: len(pattern_sets[name]))
+            return card_name, patterns[card_name], idx
     return None, None, -1
 
+# Common statement date formats, tried in this order
+DATE_FORMATS = ['%m/%d/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m-%d-%y']
+
 def parse_date(date_str: str) -> str:
     """Convert various date formats to YYYY-MM-DD."""
     try:
         # Handle common date formats
-        for fmt in ['%m/%d/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m-%d-%y']:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.strptime(date_str.strip(), fmt).strftime('%Y-%m-%d')
             except ValueError:
@@ -46,6 +54,24 @@ def parse_date(date_str: str) -> str:
     except:
         return date_str  # Return original if parsing fails
 
+def parse_dates(dates: pd.Series) -> pd.Series:
+    """Column-wise parse_date: each format is parsed once over the values still unparsed."""
+    stripped = dates.str.strip()
+    out = pd.Series(index=dates.index, dtype=object)
+    todo = np.ones(len(dates), dtype=bool)
+    for fmt in DATE_FORMATS:
+        if not todo.any():
+            break
+        parsed = pd.to_datetime(stripped[todo], format=fmt, errors='coerce')
+        ok = parsed.notna().to_numpy()
+        hits = np.flatnonzero(todo)[ok]
+        out.iloc[hits] = parsed[ok].dt.strftime('%Y-%m-%d').to_numpy()
+        todo[hits] = False
+    # Whatever pandas can't parse (including dates outside its Timestamp range) goes
+    # through parse_date, which returns unparseable values unchanged
+    out[todo] = dates[todo].map(parse_date).to_numpy()
+    return out.astype(str)
+
 def normalize_amount(amount_str: str) -> float:
     """Convert amount string to float, handling credits/debits."""
     try:
@@ -59,6 +85,11 @@ def normalize_amount(amount_str: str) -> float:
     except:
         return 0.0
 
+def normalize_amounts(amounts: pd.Series) -> pd.Series:
+    """Column-wise normalize_amount: unparseable amounts become 0.0."""
+    cleaned = amounts.str.replace(r'[^\d.-]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').fillna(0.0).astype(float)
+
 def parse_statement_file(input_file: str, patterns_file: str) -> pd.DataFrame:
     """
     Parse a credit card statement CSV file using patterns from patterns_file.
@@ -74,12 +105,10 @@ def parse_statement_file(input_file: str, patterns_file: str) -> pd.DataFrame:
     # Load patterns
     patterns = load_patterns(patterns_file)
     
-    # Read the entire input file
+    # Find matching pattern and where data starts. The file is scanned line by line and
+    # reading stops at the header; read_csv below parses the data rows itself.
     with open(input_file, 'r') as f:
-        file_content = f.readlines()
-    
-    # Find matching pattern and where data starts
-    card_name, headers, start_idx = find_matching_pattern(file_content, patterns)
+        card_name, headers, start_idx = find_matching_pattern(f, patterns)
     
     if not card_name or not headers:
         raise ValueError(f"No matching pattern found for {input_file}")
@@ -116,49 +145,42 @@ def parse_statement_file(input_file: str, patterns_file: str) -> pd.DataFrame:
     if date_col is None or desc_col is None:
         raise ValueError(f"Could not find required date/description columns for {card_name}. Headers: {headers}")
     
-    # Initialize lists for our data
-    dates = []
-    descriptions = []
-    amounts = []
-    cards = []  # New list for card names
-
-    # Process each line after the headers
-    for line in file_content[start_idx + 1:]:
-        row = [col.strip() for col in line.split(',')]
-        if len(row) >= len(headers) and any(row):  # Skip empty lines
-            # Get date
-            if len(row) > date_col and row[date_col]:
-                date = parse_date(row[date_col])
-                
-                # Get description
-                description = row[desc_col] if len(row) > desc_col else ''
-                
-                # Handle amount based on card type
-                amount = 0.0
-                for col1, col2, amt_type in amount_cols:
-                    if amt_type == 'dc':  # Debit - Credit
-                        debit = normalize_amount(row[col1]) if len(row) > col1 and row[col1] else 0.0
-                        credit = normalize_amount(row[col2]) if len(row) > col2 and row[col2] else 0.0
-                        amount = debit - credit
-                    else:  # Single amount column
-                        if len(row) > col1 and row[col1]:
-                            amount = normalize_amount(row[col1])
-                
-                # Only add if we have valid data
-                if date and description and amount != 0.0:
-                    dates.append(date)
-                    descriptions.append(description)
-                    amounts.append(amount)
-                    cards.append(card_name)  
+    # Read the rows below the header line with the C parser, which handles quoted commas.
+    # Only the needed columns are kept and short rows are padded with ''. index_col=False
+    # stops pandas from taking the first column as the index when data rows carry a
+    # trailing comma (one field more than the header), which would shift every column left.
+    used_cols = [date_col, desc_col] + [col for col1, col2, _ in amount_cols for col in (col1, col2) if col is not None]
+    wanted = {headers[col].lower() for col in used_cols}
+    data = pd.read_csv(input_file, skiprows=start_idx, engine='c', dtype=str, na_filter=False,
+                       index_col=False, usecols=lambda c: c.strip().lower() in wanted)
+    data.columns = data.columns.str.strip().str.lower()
+    column = lambda col: data[headers[col].lower()].str.strip()
+    
+    # Skip rows without a date
+    dates = column(date_col)
+    has_date = (dates != '').to_numpy()
+    data = data[has_date].reset_index(drop=True)
+    
+    # Handle amount based on card type
+    amount = pd.Series(0.0, index=data.index)
+    for col1, col2, amt_type in amount_cols:
+        if amt_type == 'dc':  # Debit - Credit
+            amount = normalize_amounts(column(col1)) - normalize_amounts(column(col2))
+        else:  # Single amount column
+            amount = normalize_amounts(column(col1))
     
     # Create DataFrame
     df = pd.DataFrame({
-        'date': dates,
-        'description': descriptions,
-        'amount': amounts,
-        'card': cards
+        'date': parse_dates(column(date_col)),
+        'description': column(desc_col),
+        'amount': amount,
+        'card': [card_name] * len(data)
     })
     
+    # Only keep rows with valid data
+    valid = (df['date'] != '') & (df['description'] != '') & (df['amount'] != 0.0)
+    df = df[valid].reset_index(drop=True)
+    
     # Sort by date
     df = df.sort_values('date', ascending=False)
     